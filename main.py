@@ -1,16 +1,65 @@
+import asyncio
+import csv
+import logging
+import logging.handlers
+import queue
 import socket
-import pandas as pd
+import sys
 import re
 import os
 import time
-from urllib.parse import urljoin, urlparse
-from playwright.sync_api import sync_playwright
+from collections import deque
+from functools import lru_cache
+from urllib.parse import quote, unquote, urljoin, urlparse
+import httpx
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+from selectolax.parser import HTMLParser
+
+log = logging.getLogger("oscr")
 
 INPUT_FILE = "TrusteeConnect Data.csv"
 OUTPUT_FILE = "charity_results.csv"
 
+# Browser profile kept between runs (HTTP cache + cookies)
+PROFILE_DIR = ".pw-profile"
+
+# Set by OSCR's cookie banner (Civic Cookie Control) once a choice is made
+CONSENT_COOKIE = "CookieControl"
+
 MAIN_URL = "https://www.oscr.org.uk/search/register-search?Keyword="
 
+# Number of browser pages processing charities at the same time
+MAX_PARALLEL = 5
+
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    )
+}
+
+# Only HTML responses up to this size are scanned
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+MAX_HTML_BYTES = 2_000_000
+
+# Links to these files are never crawled
+SKIPPED_LINK_EXTENSIONS = frozenset({
+    "pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "odt", "rtf", "csv",
+    "zip", "rar", "7z", "gz", "exe", "dmg",
+    "png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "bmp", "tif", "tiff",
+    "mp3", "mp4", "mov", "avi", "wav", "webm", "css", "js", "xml", "json"
+})
+
+# Pages shorter than this, or showing these markers, are rendered in the browser
+MIN_HTML_LENGTH = 500
+JS_ONLY_MARKERS = (
+    "enable javascript",
+    "javascript is required",
+    "requires javascript",
+    '<div id="root"></div>',
+    '<div id="app"></div>'
+)
+
 EMAIL_REGEX = r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b"
 
 GENERIC_PREFIXES = [
@@ -22,32 +71,31 @@ GENERIC_PREFIXES = [
 # CSV INPUT
 # --------------------------------------------------
 def extract_charity_names(file_path, column_name="Charity Name"):
-    df = pd.read_csv(
-        file_path,
-        usecols=[column_name],
-        dtype=str,
-        encoding="cp1252",
-        engine="c"
-    )
-    return df[column_name].dropna().str.strip().tolist()
+    with open(file_path, encoding="cp1252", newline="") as f:
+        reader = csv.DictReader(f)
+        return [
+            row[column_name].strip()
+            for row in reader
+            if row.get(column_name)
+        ]
 
 # --------------------------------------------------
 # INTERNET CHECK
 # --------------------------------------------------
 def internet_available():
     try:
-        socket.create_connection(("8.8.8.8", 53), timeout=3)
-        return True
-    except:
+        with socket.create_connection(("8.8.8.8", 53), timeout=3):
+            return True
+    except OSError:
         return False
 
 # --------------------------------------------------
 # SAFE NAVIGATION (UPDATED LOGIC)
 # --------------------------------------------------
-def safe_goto(page, url, retry_delay=5):
+async def safe_goto(page, url, retry_delay=5):
     while True:
         try:
-            response = page.goto(
+            response = await page.goto(
                 url,
                 timeout=15000,
                 wait_until="domcontentloaded"
@@ -56,7 +104,7 @@ def safe_goto(page, url, retry_delay=5):
             if response:
                 status = response.status
                 if status >= 400:
-                    print(f"⚠ Skipping {url} (HTTP {status})")
+                    log.warning("⚠ Skipping %s (HTTP %s)", url, status)
                     return False
 
             return True
@@ -66,113 +114,301 @@ def safe_goto(page, url, retry_delay=5):
 
             # ONLY retry if whole internet is disconnected
             if "net::err_internet_disconnected" in error_message:
-                print("\n⚠ Internet disconnected.")
-                print(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
+                log.warning("⚠ Internet disconnected. Retrying in %s seconds...", retry_delay)
+                await asyncio.sleep(retry_delay)
                 continue
 
             # DNS errors (NXDOMAIN), timeouts, refused connections etc.
-            print(f"⏭ Skipping {url} ({error_message.splitlines()[0]})")
+            log.warning("⏭ Skipping %s (%s)", url, error_message.splitlines()[0])
             return False
 # --------------------------------------------------
+# PLAIN HTTP FETCH
+# --------------------------------------------------
+async def fetch_html(client, url, retry_delay=5):
+    while True:
+        try:
+            async with client.stream("GET", url) as response:
+                if response.status_code >= 400:
+                    log.warning("⚠ Skipping %s (HTTP %s)", url, response.status_code)
+                    return None
+
+                # Decide from the headers, before downloading the body
+                content_type = response.headers.get("content-type", "")
+                content_type = content_type.split(";", 1)[0].strip().lower()
+                if content_type and content_type not in HTML_CONTENT_TYPES:
+                    log.info("⏭ Skipping %s (%s)", url, content_type)
+                    return None
+
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > MAX_HTML_BYTES:
+                        log.info("⏭ Skipping %s (larger than %s bytes)", url, MAX_HTML_BYTES)
+                        return None
+
+                return body.decode(response.encoding or "utf-8", errors="replace")
+
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            # ONLY retry if whole internet is disconnected
+            if isinstance(e, httpx.ConnectError) and not await asyncio.to_thread(internet_available):
+                log.warning("⚠ Internet disconnected. Retrying in %s seconds...", retry_delay)
+                await asyncio.sleep(retry_delay)
+                continue
+
+            # DNS errors (NXDOMAIN), timeouts, refused connections etc.
+            message = str(e).splitlines()[0] if str(e) else type(e).__name__
+            log.warning("⏭ Skipping %s (%s)", url, message)
+            return None
+
+def needs_browser(html):
+    if len(html) < MIN_HTML_LENGTH:
+        return True
+    lowered = html.lower()
+    return any(marker in lowered for marker in JS_ONLY_MARKERS)
+
+# --------------------------------------------------
+# RESOURCE BLOCKING
+# --------------------------------------------------
+# Blocked by URL pattern over CDP rather than with context.route():
+# Playwright disables the HTTP cache for routed contexts, which would
+# defeat the persistent profile. Stylesheets are kept: the cookie banner
+# check relies on visibility.
+BLOCKED_EXTENSIONS = (
+    "png", "jpg", "jpeg", "gif", "webp", "svg", "ico",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "mp3", "ogg"
+)
+TRACKER_HOSTS = (
+    "googletagmanager.com",
+    "google-analytics.com",
+    "doubleclick.net",
+    "hotjar.com",
+    "facebook.net"
+)
+BLOCKED_URL_PATTERNS = (
+    [f"*.{ext}" for ext in BLOCKED_EXTENSIONS]
+    + [f"*.{ext}?*" for ext in BLOCKED_EXTENSIONS]
+    + [f"*{host}/*" for host in TRACKER_HOSTS]
+)
+
+async def block_heavy_resources(context, page):
+    session = await context.new_cdp_session(page)
+    await session.send("Network.enable")
+    await session.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+# --------------------------------------------------
 # COOKIE HANDLER
 # --------------------------------------------------
-def handle_cookie_once(page):
+async def has_cookie_consent(context):
+    cookies = await context.cookies(MAIN_URL)
+    return any(cookie["name"] == CONSENT_COOKIE for cookie in cookies)
+
+async def handle_cookie_once(page):
     try:
-        page.wait_for_timeout(2000)
-        button = page.query_selector("#ccc-reject-settings")
-        if button and button.is_visible():
-            button.click()
+        button = await page.wait_for_selector("#ccc-reject-settings", timeout=2000)
+        if button:
+            await button.click()
+            return True
     except:
         pass
 
+    return False
+
 # --------------------------------------------------
 # EMAIL CLEANING
 # --------------------------------------------------
 VALID_TLD_MIN_LENGTH = 2
 MAX_LOCAL_LENGTH = 64
-IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp", "svg", "css", "js", "ico", "pdf"}
-
+IMAGE_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "gif", "webp", "svg", "css", "js", "ico", "pdf"})
+
+_EMAIL_RE = re.compile(EMAIL_REGEX)
+_TLD_RE = re.compile(r"[a-z]{%d,}" % VALID_TLD_MIN_LENGTH)
+_ALPHA_RE = re.compile(r"[a-z]")
+_NXN_RE = re.compile(r"\d+x\d+")
+
+# Whole pages are scanned with RE2 (linear time) when google-re2 is installed
+try:
+    import re2
+    _EMAIL_SCAN_RE = re2.compile(EMAIL_REGEX)
+except ImportError:
+    _EMAIL_SCAN_RE = _EMAIL_RE
+
+# The same addresses repeat across pages (headers, footers), so cache verdicts
+@lru_cache(maxsize=4096)
 def clean_email(email):
-    email = email.strip().lower()
-
-    match = re.search(EMAIL_REGEX, email)
-    if not match:
+    # Cheap string checks first; most junk candidates never reach a regex
+    if "@" not in email or "." not in email:
         return None
 
-    email = match.group(0)
+    email = email.strip().lower()
 
-    try:
-        local, domain = email.split("@", 1)
-    except:
-        return None
+    at = email.rfind("@")
+    local, domain = email[:at], email[at + 1:]
 
-    if len(local) > MAX_LOCAL_LENGTH:
+    if not local or len(local) > MAX_LOCAL_LENGTH:
         return None
 
     if "." not in domain:
         return None
 
-    parts = domain.split(".")
-    tld = parts[-1]
+    tld = domain.rsplit(".", 1)[1]
 
     if tld in IMAGE_EXTENSIONS:
         return None
 
-    if not re.fullmatch(r"[a-z]{%d,}" % VALID_TLD_MIN_LENGTH, tld):
+    if not _TLD_RE.fullmatch(tld):
         return None
 
-    if not re.search(r"[a-z]", domain):
+    if not _ALPHA_RE.search(domain):
         return None
 
-    if re.search(r"\d+x\d+", domain):
+    if _NXN_RE.search(domain):
+        return None
+
+    if not _EMAIL_RE.fullmatch(email):
         return None
 
     return email
 
+def email_rank(email):
+    for rank, prefix in enumerate(GENERIC_PREFIXES):
+        if email.startswith(prefix):
+            return rank, email
+    # Tie-break on the address so the choice doesn't depend on set order
+    return len(GENERIC_PREFIXES), email
+
 def choose_best_email(emails):
-    for prefix in GENERIC_PREFIXES:
-        for email in emails:
-            if email.startswith(prefix):
-                return email
-    return next(iter(emails)) if emails else None
+    if not emails:
+        return None
+    return min(emails, key=email_rank)
 
 # --------------------------------------------------
 # EXTRACT EMAILS
 # --------------------------------------------------
-def extract_emails_from_page(page):
-    emails = set()
+MAILTO_SELECTOR = 'a[href^="mailto:"]'
+
+def parse_html(html):
     try:
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        page.wait_for_timeout(1200)
+        return HTMLParser(html)
+    except:
+        return None
+
+def extract_emails_from_mailtos(hrefs):
+    emails = set()
+
+    for href in hrefs:
+        if not href:
+            continue
 
-        html = page.content()
-        matches = re.findall(EMAIL_REGEX, html)
+        # mailto:a@x.org,b@x.org?subject=...
+        addresses = unquote(href[len("mailto:"):].split("?", 1)[0])
 
-        for match in matches:
+        for match in _EMAIL_RE.findall(addresses):
             valid = clean_email(match)
             if valid:
                 emails.add(valid)
 
+    return emails
+
+def extract_emails_from_html(html, tree=None):
+    # mailto: links are cheap to find and rarely false positives
+    if tree is not None:
+        emails = extract_emails_from_mailtos(
+            node.attributes.get("href") for node in tree.css(MAILTO_SELECTOR)
+        )
+        if emails:
+            return emails
+
+    emails = set()
+
+    for match in _EMAIL_SCAN_RE.findall(html):
+        valid = clean_email(match)
+        if valid:
+            emails.add(valid)
+
+    return emails
+
+async def extract_emails_from_page(page):
+    try:
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+        # Give lazy-loaded content a chance, without a fixed sleep
+        try:
+            await page.wait_for_load_state("load", timeout=3000)
+        except PlaywrightTimeoutError:
+            pass
+
+        anchors = await page.query_selector_all(MAILTO_SELECTOR)
+        emails = extract_emails_from_mailtos(
+            [await anchor.get_attribute("href") for anchor in anchors]
+        )
+        if emails:
+            return emails
+
+        html = await page.content()
+        return extract_emails_from_html(html)
+
+    except:
+        return set()
+
+def extract_links(tree, base_url, domain):
+    links = []
+    if tree is None:
+        return links
+
+    try:
+        for node in tree.css("a[href]"):
+            href = node.attributes.get("href")
+            if not href:
+                continue
+
+            try:
+                full_url = urljoin(base_url, href)
+                parsed = urlparse(full_url)
+            except ValueError:
+                continue
+
+            # Skips mailto:, tel:, javascript: and the like
+            if parsed.scheme not in ("http", "https"):
+                continue
+
+            extension = os.path.splitext(parsed.path)[1].lstrip(".").lower()
+            if extension in SKIPPED_LINK_EXTENSIONS:
+                continue
+
+            if domain in full_url:
+                links.append(full_url)
     except:
         pass
 
-    return emails
+    return links
 
 # --------------------------------------------------
 # CONTROLLED DOMAIN CRAWLER
 # --------------------------------------------------
-def crawl_for_email(page, start_url, max_pages=10):
+def canonical_url(url):
+    return url.split("#", 1)[0].rstrip("/")
+
+async def scan_html(page, url, html, domain):
+    # JS-only pages fall back to a full browser render
+    if needs_browser(html) and await safe_goto(page, url):
+        emails = await extract_emails_from_page(page)
+        try:
+            html = await page.content()
+        except:
+            pass
+        tree = parse_html(html)
+    else:
+        tree = parse_html(html)
+        emails = extract_emails_from_html(html, tree)
+
+    return emails, extract_links(tree, url, domain)
+
+async def crawl_site(client, page, start_url, max_pages=10):
     parsed = urlparse(start_url)
     domain = parsed.netloc
     root_url = f"{parsed.scheme}://{parsed.netloc}"
 
-    visited = set()
-    queue = [start_url]
-
-    if start_url != root_url:
-        queue.append(root_url)
-
     common_paths = [
         "/contact",
         "/contact.php",
@@ -184,199 +420,397 @@ def crawl_for_email(page, start_url, max_pages=10):
         "/team"
     ]
 
-    for path in common_paths:
-        queue.append(root_url + path)
+    start_url = canonical_url(start_url)
+    visited = {start_url}
+    fetched = False
+    to_visit = deque()
+    queued = set()
+
+    def enqueue(links):
+        for link in links:
+            canon = canonical_url(link)
+            if canon not in queued and canon not in visited:
+                queued.add(canon)
+                to_visit.append(canon)
+
+    # Phase 1: the website listed on OSCR often shows the email already
+    log.info("Scanning: %s", start_url)
+    html = await fetch_html(client, start_url)
+    if html is not None:
+        fetched = True
+        emails, links = await scan_html(page, start_url, html, domain)
+        if emails:
+            return choose_best_email(emails), fetched
+        enqueue(links)
+
+    # Phase 2: homepage + common contact paths, fetched together and
+    # checked in priority order
+    seeds = [root_url] + [root_url + path for path in common_paths]
+    seeds = [url for url in dict.fromkeys(canonical_url(url) for url in seeds) if url not in visited]
+    seeds = seeds[:max_pages - len(visited)]
+    visited.update(seeds)
 
-    while queue and len(visited) < max_pages:
-        url = queue.pop(0)
+    for url in seeds:
+        log.info("Scanning: %s", url)
 
+    seed_html = await asyncio.gather(*(fetch_html(client, url) for url in seeds))
+
+    for url, html in zip(seeds, seed_html):
+        if html is None:
+            continue
+
+        fetched = True
+        emails, links = await scan_html(page, url, html, domain)
+        if emails:
+            return choose_best_email(emails), fetched
+
+        enqueue(links)
+
+    # Phase 3: breadth-first over links discovered so far
+    while to_visit and len(visited) < max_pages:
+        url = to_visit.popleft()
         if url in visited:
             continue
 
         visited.add(url)
-        print(f"Scanning: {url}")
+        log.info("Scanning: %s", url)
 
-        if not safe_goto(page, url):
+        html = await fetch_html(client, url)
+        if html is None:
             continue
 
-        emails = extract_emails_from_page(page)
+        fetched = True
+        emails, links = await scan_html(page, url, html, domain)
         if emails:
-            return choose_best_email(emails)
+            return choose_best_email(emails), fetched
 
-        try:
-            links = page.query_selector_all("a[href]")
-            for link in links:
-                href = link.get_attribute("href")
-                if not href:
-                    continue
+        enqueue(links)
 
-                full_url = urljoin(url, href)
+    # fetched tells "no email on the site" apart from "site unreachable"
+    return None, fetched
 
-                if domain in full_url and full_url not in visited:
-                    queue.append(full_url)
-        except:
-            continue
+# Charities sharing a website (umbrella orgs, branches) are crawled once.
+# The lock also stops parallel workers from hitting the same host together.
+_DOMAIN_EMAIL_CACHE = {}
+_DOMAIN_LOCKS = {}
 
-    return None
+# Platforms hosting many unrelated organisations under one domain
+SHARED_HOSTS = (
+    "facebook.com",
+    "instagram.com",
+    "twitter.com",
+    "x.com",
+    "linkedin.com",
+    "linktr.ee",
+    "sites.google.com",
+    "youtube.com"
+)
+
+def site_key(url):
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+
+    # On shared platforms the first path segment identifies the organisation
+    if any(host == h or host.endswith("." + h) for h in SHARED_HOSTS):
+        segments = [segment for segment in parsed.path.split("/") if segment]
+        if host == "sites.google.com" and len(segments) > 1 and segments[0] == "view":
+            segments = segments[1:]
+        # A bare platform URL says nothing about the charity, so don't cache it
+        return f"{host}/{segments[0].lower()}" if segments else None
+
+    return parsed.netloc
+
+async def crawl_for_email(client, page, start_url, max_pages=10):
+    netloc = urlparse(start_url).netloc
+    key = site_key(start_url)
+
+    async with _DOMAIN_LOCKS.setdefault(netloc, asyncio.Lock()):
+        if key is not None and key in _DOMAIN_EMAIL_CACHE:
+            log.info("Already crawled %s, reusing result.", key)
+            return _DOMAIN_EMAIL_CACHE[key]
+
+        result, fetched = await crawl_site(client, page, start_url, max_pages)
+
+        # Don't let a transient failure stick for the rest of the run
+        if fetched and key is not None:
+            _DOMAIN_EMAIL_CACHE[key] = result
+
+    return result
 
 # --------------------------------------------------
 # RESUME + DUPLICATE PROTECTION
 # --------------------------------------------------
-def load_existing_results():
-    if not os.path.exists(OUTPUT_FILE):
-        return pd.DataFrame()
-    try:
-        return pd.read_csv(OUTPUT_FILE)
-    except:
-        return pd.DataFrame()
+OUTPUT_FIELDS = [
+    "Index",
+    "Charity Name",
+    "Website Status",
+    "Website URL",
+    "Contact Email Status",
+    "Contact Email"
+]
 
-def append_result(row):
-    existing_df = load_existing_results()
+def drop_partial_row(path):
+    # A hard kill can leave the last row half-written (possibly inside a
+    # quoted field); cut the file back to its last complete line so that
+    # charity is redone and new rows start cleanly.
+    if not os.path.exists(path):
+        return
 
-    if not existing_df.empty:
-        if row["Charity Name"] in existing_df["Charity Name"].values:
-            print("Duplicate charity detected. Skipping write.")
+    with open(path, "rb+") as f:
+        data = f.read()
+        if not data or data.endswith(b"\n"):
             return
+        f.truncate(data.rfind(b"\n") + 1)
 
-    df = pd.DataFrame([row])
+def load_resume_state():
+    seen = set()
+    resume_index = 0
 
-    if existing_df.empty:
-        df.to_csv(OUTPUT_FILE, index=False)
-    else:
-        df.to_csv(OUTPUT_FILE, mode="a", header=False, index=False)
-
-def get_resume_index():
     if not os.path.exists(OUTPUT_FILE):
-        return 0
+        return seen, resume_index
 
     try:
-        df = pd.read_csv(OUTPUT_FILE)
+        with open(OUTPUT_FILE, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
 
-        if df.empty:
-            return 0
+        for row in rows:
+            # Short rows (from an earlier interrupted write) are ignored
+            if any(row.get(field) is None for field in OUTPUT_FIELDS):
+                continue
 
-        if "Index" not in df.columns:
-            return 0
+            if row.get("Charity Name"):
+                seen.add(row["Charity Name"])
+            try:
+                resume_index = max(resume_index, int(float(row["Index"])) + 1)
+            except (KeyError, TypeError, ValueError):
+                continue
+    except:
+        return set(), 0
 
-        df = df.dropna(subset=["Index"])
-        last_index = df["Index"].astype(int).max()
+    return seen, resume_index
 
-        return last_index + 1
+# Results are forced to disk every FLUSH_EVERY rows and when the run ends
+FLUSH_EVERY = 25
+_rows_since_flush = 0
 
-    except:
-        return 0
+def sync_results(out_f):
+    global _rows_since_flush
+
+    out_f.flush()
+    os.fsync(out_f.fileno())
+
+    if _rows_since_flush:
+        log.info("Saved progress (%s rows).", _rows_since_flush)
+    _rows_since_flush = 0
+
+def append_result(writer, out_f, seen, row):
+    global _rows_since_flush
+
+    if row["Charity Name"] in seen:
+        log.info("Duplicate charity detected. Skipping write.")
+        return
+
+    seen.add(row["Charity Name"])
+    writer.writerow(row)
+
+    _rows_since_flush += 1
+    if _rows_since_flush >= FLUSH_EVERY:
+        sync_results(out_f)
 
 # --------------------------------------------------
 # WAIT FOR WEBSITE COLUMN
 # --------------------------------------------------
-def wait_for_website_column(page, max_attempts=15):
-    for _ in range(max_attempts):
-        try:
-            page.wait_for_load_state("domcontentloaded")
-
-            website_element = page.query_selector(
-                "span.col-7.col-lg-9.text a[target='_blank']"
-            )
-
-            if website_element:
-                return website_element.get_attribute("href")
+WEBSITE_SELECTOR = "span.col-7.col-lg-9.text a[target='_blank']"
+RESULT_ROW_SELECTOR = "div.charitydetailrow"
 
-            result_row = page.query_selector("div.charitydetailrow")
-            if result_row:
-                break
+async def wait_for_website_column(page, timeout=8000):
+    try:
+        # A result row without a website link means there is nothing to wait for
+        await page.wait_for_selector(
+            f"{WEBSITE_SELECTOR}, {RESULT_ROW_SELECTOR}",
+            timeout=timeout
+        )
 
-            page.wait_for_timeout(1000)
+        website_element = await page.query_selector(WEBSITE_SELECTOR)
+        if website_element:
+            return await website_element.get_attribute("href") or ""
 
-        except:
-            page.wait_for_timeout(1000)
-            continue
+    except PlaywrightTimeoutError:
+        pass
 
     return ""
 
 # --------------------------------------------------
-# MAIN PROCESSOR (UPDATED)
+# OSCR SEARCH
 # --------------------------------------------------
-def process_all_charities():
-    charities = extract_charity_names(INPUT_FILE)
-    start_index = get_resume_index()
+async def search_with_form(page, charity):
+    if not await safe_goto(page, MAIN_URL):
+        return ""
 
-    print(f"Resuming from index: {start_index}")
+    await page.wait_for_selector("#CharityName", timeout=15000)
 
-    total_time = 0
-    execution_count = 0
+    await page.fill("#CharityName", "")
+    await page.fill("#CharityName", charity)
+    async with page.expect_navigation(wait_until="domcontentloaded"):
+        await page.click("#search-submit")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=["--start-maximized"])
-        context = browser.new_context(ignore_https_errors=True)
-        page = context.new_page()
+    return await wait_for_website_column(page)
 
-        if not safe_goto(page, MAIN_URL):
-            print("Failed to open OSCR.")
-            return
+async def search_oscr(page, charity):
+    # The search is a plain GET, so go straight to the results page
+    if await safe_goto(page, MAIN_URL + quote(charity)):
+        website_url = await wait_for_website_column(page)
+        if website_url or await page.query_selector(RESULT_ROW_SELECTOR):
+            return website_url
 
-        handle_cookie_once(page)
+    # No results from the direct URL: retry through the search form
+    return await search_with_form(page, charity)
 
-        for idx in range(start_index, len(charities)):
-            start_time = time.time()
+# --------------------------------------------------
+# SINGLE CHARITY
+# --------------------------------------------------
+async def process_one(client, page, idx, charity):
+    start_time = time.time()
 
-            charity = charities[idx]
-            print(f"\nProcessing [{idx}] {charity}")
+    log.info("Processing [%s] %s", idx, charity)
 
-            website_status = "Not Found"
-            website_url = ""
-            email_status = "Not Found"
-            contact_email = ""
+    website_status = "Not Found"
+    website_url = ""
+    email_status = "Not Found"
+    contact_email = ""
 
-            try:
-                if not safe_goto(page, MAIN_URL):
-                    continue
+    try:
+        website_url = await search_oscr(page, charity)
+
+        if website_url:
+            website_status = "Found"
+            log.info("[%s] Website Found: %s", idx, website_url)
 
-                page.wait_for_selector("#CharityName", timeout=15000)
+            best_email = await crawl_for_email(client, page, website_url)
 
-                page.fill("#CharityName", "")
-                page.fill("#CharityName", charity)
-                page.click("#search-submit")
-                page.wait_for_load_state("networkidle")
+            if best_email:
+                email_status = "Found"
+                contact_email = best_email
+                log.info("[%s] ✅ Email Found: %s", idx, contact_email)
+        else:
+            log.info("[%s] Website not found.", idx)
 
-                website_url = wait_for_website_column(page)
+    except Exception as e:
+        log.error("Error processing %s: %s", charity, e)
+
+    row = {
+        "Index": idx,
+        "Charity Name": charity,
+        "Website Status": website_status,
+        "Website URL": website_url,
+        "Contact Email Status": email_status,
+        "Contact Email": contact_email
+    }
+
+    return row, time.time() - start_time
+
+# --------------------------------------------------
+# MAIN PROCESSOR (UPDATED)
+# --------------------------------------------------
+async def process_all_charities():
+    charities = extract_charity_names(INPUT_FILE)
+    drop_partial_row(OUTPUT_FILE)
+    seen, start_index = load_resume_state()
 
-                if website_url:
-                    website_status = "Found"
-                    print(f"Website Found: {website_url}")
+    log.info("Resuming from index: %s", start_index)
 
-                    best_email = crawl_for_email(page, website_url)
+    total_time = 0
+    execution_count = 0
 
-                    if best_email:
-                        email_status = "Found"
-                        contact_email = best_email
-                        print(f"✅ Email Found: {contact_email}")
-                else:
-                    print("Website not found.")
+    write_header = not os.path.exists(OUTPUT_FILE) or os.path.getsize(OUTPUT_FILE) == 0
 
-            except Exception as e:
-                print(f"Error processing {charity}: {e}")
+    with open(OUTPUT_FILE, "a", encoding="utf-8", newline="") as out_f:
+        writer = csv.DictWriter(out_f, fieldnames=OUTPUT_FIELDS)
+        if write_header:
+            writer.writeheader()
 
-            append_result({
-                "Index": idx,
-                "Charity Name": charity,
-                "Website Status": website_status,
-                "Website URL": website_url,
-                "Contact Email Status": email_status,
-                "Contact Email": contact_email
-            })
+        # Also runs on Ctrl+C (KeyboardInterrupt / cancellation), so no rows are lost
+        try:
+            async with async_playwright() as p, httpx.AsyncClient(
+                http2=True,
+                timeout=10,
+                follow_redirects=True,
+                verify=False,
+                headers=HTTP_HEADERS
+            ) as client:
+                context = await p.chromium.launch_persistent_context(
+                    user_data_dir=PROFILE_DIR,
+                    headless=True,
+                    ignore_https_errors=True,
+                    args=["--start-maximized"]
+                )
+
+                pages = list(context.pages[:MAX_PARALLEL])
+                while len(pages) < MAX_PARALLEL:
+                    pages.append(await context.new_page())
+
+                for page in pages:
+                    await block_heavy_resources(context, page)
+
+                if not await safe_goto(pages[0], MAIN_URL):
+                    log.error("Failed to open OSCR.")
+                    await context.close()
+                    return
+
+                # Pages share the context, so the cookie choice applies to all of them.
+                # The consent cookie is stored in the profile, so later runs skip it
+                # until it expires.
+                if not await has_cookie_consent(context):
+                    if not await handle_cookie_once(pages[0]):
+                        log.warning("Cookie banner not dismissed.")
+
+                for batch_start in range(start_index, len(charities), MAX_PARALLEL):
+                    batch = list(enumerate(
+                        charities[batch_start:batch_start + MAX_PARALLEL],
+                        start=batch_start
+                    ))
+
+                    results = await asyncio.gather(*(
+                        process_one(client, page, idx, charity)
+                        for page, (idx, charity) in zip(pages, batch)
+                    ))
+
+                    # Save in index order so resume never skips an unsaved charity
+                    for row, execution_time in results:
+                        append_result(writer, out_f, seen, row)
+
+                        total_time += execution_time
+                        execution_count += 1
+                        avg_time = total_time / execution_count
+
+                        log.info("Execution Time [%s]: %.2f sec", row["Index"], execution_time)
+                        log.info("Average Time: %.2f sec", avg_time)
+
+                await context.close()
+        finally:
+            sync_results(out_f)
 
-            end_time = time.time()
-            execution_time = end_time - start_time
+# --------------------------------------------------
+# LOGGING
+# --------------------------------------------------
+def setup_logging():
+    # Workers only enqueue records; a background thread writes them to stderr
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
 
-            total_time += execution_time
-            execution_count += 1
-            avg_time = total_time / execution_count
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, handler)
 
-            print(f"Execution Time: {execution_time:.2f} sec")
-            print(f"Average Time: {avg_time:.2f} sec")
-            print("Saved progress.")
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.setLevel(logging.INFO)
+    log.propagate = False
 
-        browser.close()
+    listener.start()
+    return listener
 
 if __name__ == "__main__":
-    process_all_charities()
\ No newline at end of file
+    listener = setup_logging()
+    try:
+        asyncio.run(process_all_charities())
+    finally:
+        listener.stop()
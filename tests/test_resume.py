@@ -0,0 +1,92 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+HEADER = ",".join(main.OUTPUT_FIELDS) + "\r\n"
+
+
+def make_row(idx, name):
+    return {
+        "Index": idx,
+        "Charity Name": name,
+        "Website Status": "Found",
+        "Website URL": "https://example.org",
+        "Contact Email Status": "Found",
+        "Contact Email": "info@example.org"
+    }
+
+
+def resume_and_append(output_file, rows):
+    main.drop_partial_row(output_file)
+    seen, start_index = main.load_resume_state()
+
+    with open(output_file, "a", encoding="utf-8", newline="") as out_f:
+        writer = csv.DictWriter(out_f, fieldnames=main.OUTPUT_FIELDS)
+        for row in rows:
+            main.append_result(writer, out_f, seen, row)
+
+    return seen, start_index
+
+
+def read_rows(output_file):
+    with open(output_file, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_partial_quoted_row_is_dropped_and_redone(tmp_path, monkeypatch):
+    output_file = str(tmp_path / "charity_results.csv")
+    monkeypatch.setattr(main, "OUTPUT_FILE", output_file)
+
+    with open(output_file, "w", encoding="utf-8", newline="") as f:
+        f.write(HEADER)
+        f.write("0,Alpha Trust,Found,https://a.org,Found,info@a.org\r\n")
+        f.write('1,"Friends of X, Y')
+
+    seen, start_index = resume_and_append(output_file, [
+        make_row(1, "Friends of X, Y"),
+        make_row(2, "Beta Fund")
+    ])
+
+    assert start_index == 1
+    assert seen == {"Alpha Trust", "Friends of X, Y", "Beta Fund"}
+
+    rows = read_rows(output_file)
+    assert [row["Index"] for row in rows] == ["0", "1", "2"]
+    assert [row["Charity Name"] for row in rows] == ["Alpha Trust", "Friends of X, Y", "Beta Fund"]
+    assert all(row["Contact Email"] for row in rows)
+
+    assert main.load_resume_state() == ({"Alpha Trust", "Friends of X, Y", "Beta Fund"}, 3)
+
+
+def test_partial_unquoted_last_field_is_dropped(tmp_path, monkeypatch):
+    output_file = str(tmp_path / "charity_results.csv")
+    monkeypatch.setattr(main, "OUTPUT_FILE", output_file)
+
+    with open(output_file, "w", encoding="utf-8", newline="") as f:
+        f.write(HEADER)
+        f.write("0,Alpha Trust,Found,https://a.org,Found,info@exa")
+
+    seen, start_index = resume_and_append(output_file, [make_row(0, "Alpha Trust")])
+
+    assert start_index == 0
+    rows = read_rows(output_file)
+    assert len(rows) == 1
+    assert rows[0]["Contact Email"] == "info@example.org"
+
+
+def test_complete_file_is_left_untouched(tmp_path):
+    output_file = str(tmp_path / "charity_results.csv")
+    content = HEADER + "0,Alpha Trust,Found,https://a.org,Found,info@a.org\r\n"
+
+    with open(output_file, "w", encoding="utf-8", newline="") as f:
+        f.write(content)
+
+    main.drop_partial_row(output_file)
+
+    with open(output_file, encoding="utf-8", newline="") as f:
+        assert f.read() == content